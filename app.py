@@ -1,6 +1,10 @@
+import hashlib
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.colors import LinearSegmentedColormap
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -95,9 +99,11 @@ def load_css():
 load_css()
 
 # --- DATA LOADING ---
+DATA_PATH = Path("Mental Health Dataset.csv")
+
 @st.cache_data
 def load_data():
-    df = pd.read_csv("Mental Health Dataset.csv")
+    df = pd.read_csv(DATA_PATH)
     return df
 
 try:
@@ -166,6 +172,13 @@ def setup_chart_style():
         'grid.alpha': 0.3,
     })
 
+def stress_share_by_occupation(df):
+    """% of respondents reporting Growing_Stress, per Occupation (ascending)."""
+    occ_stress = df[df['Growing_Stress'] == 'Yes']['Occupation'].value_counts()
+    occ_total = df['Occupation'].value_counts()
+    # Occupations with no "Yes" answers are missing from occ_stress; they are 0%, not NaN
+    return (occ_stress.reindex(occ_total.index, fill_value=0) / occ_total * 100).sort_values(ascending=True)
+
 def plot_stress_gap(df):
     """
     Visualization 1: The Weight of Work.
@@ -175,9 +188,7 @@ def plot_stress_gap(df):
     
     # Data Prep
     # We want % of "Yes" for Growing_Stress per Occupation
-    occ_stress = df[df['Growing_Stress'] == 'Yes']['Occupation'].value_counts()
-    occ_total = df['Occupation'].value_counts()
-    stress_ratio = (occ_stress / occ_total * 100).sort_values(ascending=True)
+    stress_ratio = stress_share_by_occupation(df)
     
     # Filter for cleaner viz (keeping all for completeness)
     
@@ -304,14 +315,8 @@ with col_age_plot:
     st.pyplot(plot_age_dist(df))
 
 
-def plot_global_headspace(df):
-    """
-    Visualization 3: Global Headspace.
-    Lollipop Chart: % of people with Mental Health History by Country.
-    """
-    setup_chart_style()
-    
-    # Data Prep
+def history_rate_by_country(df):
+    """% of respondents with Mental_Health_History, per Country with > 20 respondents (ascending)."""
     # Filter countries with significant entries to avoid noise (e.g. > 20 respondents)
     country_counts = df['Country'].value_counts()
     significant_countries = country_counts[country_counts > 20].index
@@ -322,7 +327,17 @@ def plot_global_headspace(df):
     mh_history = df_sig[df_sig['Mental_Health_History'] == 'Yes']['Country'].value_counts()
     total_counts = df_sig['Country'].value_counts()
     
-    mh_ratio = (mh_history / total_counts * 100).sort_values(ascending=True)
+    return (mh_history.reindex(total_counts.index, fill_value=0) / total_counts * 100).sort_values(ascending=True)
+
+def plot_global_headspace(df):
+    """
+    Visualization 3: Global Headspace.
+    Lollipop Chart: % of people with Mental Health History by Country.
+    """
+    setup_chart_style()
+    
+    # Data Prep
+    mh_ratio = history_rate_by_country(df)
     
     fig, ax = plt.subplots(figsize=(10, 8))
     fig.patch.set_alpha(0.0)
@@ -349,50 +364,58 @@ def plot_global_headspace(df):
 
     return fig
 
-def plot_habit_loop(df):
+MOOD_ORDER = ['Low', 'Medium', 'High']
+INDOORS_ORDER = ['1-14 days', '15-30 days', '31-60 days', 'More than 2 months', 'Go out Every day']
+
+# Diverging scale for matrix deltas: Acid Sage (down) -> Frosted Graphite (no change) -> Electric Clay (up)
+DELTA_CMAP = LinearSegmentedColormap.from_list('sage_clay', ['#81B29A', '#1A1A1C', '#E07A5F'])
+
+def mood_by_indoors(df):
+    """Days_Indoors x Mood_Swings crosstab, each Mood column normalized to 100%."""
+    heatmap_data = pd.crosstab(df['Days_Indoors'], df['Mood_Swings'], normalize='columns') * 100
+    # Fixed ordering so matrices from different waves line up cell for cell.
+    # An unobserved Days_Indoors level is 0% of its Mood column; only a Mood with no respondents stays NaN.
+    return heatmap_data.reindex(index=INDOORS_ORDER, fill_value=0).reindex(columns=MOOD_ORDER)
+
+def plot_habit_matrix(heatmap_data, delta=False, figsize=(8, 6)):
     """
-    Visualization 4: Habit Loop.
-    Heatmap of Days Indoors vs Mood Swings.
+    Draws a Days Indoors x Mood Swings matrix.
+    With delta=True the cells are percentage-point changes on a diverging scale centred at zero.
     """
     setup_chart_style()
     
-    # Data Prep
-    # Cross tabulation
-    mood_order = ['Low', 'Medium', 'High']
-    indoors_order = ['1-14 days', '15-30 days', '31-60 days', 'More than 2 months', 'Go out Every day']
-    
-    # Ensure ordered categorical data for correct sorting
-    df['Mood_Swings'] = pd.Categorical(df['Mood_Swings'], categories=mood_order, ordered=True)
-    df['Days_Indoors'] = pd.Categorical(df['Days_Indoors'], categories=indoors_order, ordered=True)
-    
-    heatmap_data = pd.crosstab(df['Days_Indoors'], df['Mood_Swings'], normalize='columns') * 100
-    
-    fig, ax = plt.subplots(figsize=(8, 6))
+    fig, ax = plt.subplots(figsize=figsize)
     fig.patch.set_alpha(0.0)
     ax.patch.set_alpha(0.0)
     
     # Heatmap
     # Using imshow for a raw, digital grid look (matching the 'Void' aesthetic)
-    
-    im = ax.imshow(heatmap_data.values, cmap='bone', aspect='auto') # 'bone' is dark/greyscale/blueish
+    if delta:
+        limit = heatmap_data.abs().max().max()
+        limit = 1.0 if pd.isna(limit) or limit == 0 else limit
+        ax.imshow(heatmap_data.values, cmap=DELTA_CMAP, vmin=-limit, vmax=limit, aspect='auto')
+    else:
+        ax.imshow(heatmap_data.values, cmap='bone', aspect='auto') # 'bone' is dark/greyscale/blueish
     
     # Custom loop for text annotations
-    for i in range(len(indoors_order)):
-        for j in range(len(mood_order)):
-            try:
-                val = heatmap_data.loc[indoors_order[i], mood_order[j]]
+    for i in range(len(INDOORS_ORDER)):
+        for j in range(len(MOOD_ORDER)):
+            val = heatmap_data.iloc[i, j]
+            if pd.isna(val):
+                continue
+            if delta:
+                ax.text(j, i, f'{val:+.1f}', ha='center', va='center', color='#F4F1DE', fontsize=10)
+            else:
                 color = 'black' if val > 50 else '#F4F1DE'
                 ax.text(j, i, f'{val:.0f}%', ha='center', va='center', color=color, fontsize=10)
-            except KeyError:
-                continue
 
     # Axis Labels
-    ax.set_xticks(range(len(mood_order)))
-    ax.set_xticklabels(mood_order, fontsize=10)
+    ax.set_xticks(range(len(MOOD_ORDER)))
+    ax.set_xticklabels(MOOD_ORDER, fontsize=10)
     ax.xaxis.tick_top() # Put Mood on top
     
-    ax.set_yticks(range(len(indoors_order)))
-    ax.set_yticklabels(indoors_order, fontsize=10)
+    ax.set_yticks(range(len(INDOORS_ORDER)))
+    ax.set_yticklabels(INDOORS_ORDER, fontsize=10)
     
     for spine in ax.spines.values():
         spine.set_visible(False)
@@ -401,6 +424,13 @@ def plot_habit_loop(df):
     
     return fig
 
+def plot_habit_loop(df):
+    """
+    Visualization 4: Habit Loop.
+    Heatmap of Days Indoors vs Mood Swings.
+    """
+    return plot_habit_matrix(mood_by_indoors(df))
+
 # --- RENDER REMAINING SECTIONS ---
 
 st.markdown("<div style='height: 80px;'></div>", unsafe_allow_html=True)
@@ -668,4 +698,184 @@ with col_system:
     st.pyplot(plot_systemic_factors(df))
     st.markdown("<p style='text-align: center; font-size: 0.8rem; color: #666;'>Care Options, Family History, and Interview Openness.</p>", unsafe_allow_html=True)
 
-st.markdown("<div style='height: 100px;'></div>", unsafe_allow_html=True)
\ No newline at end of file
+st.markdown("<div style='height: 100px;'></div>", unsafe_allow_html=True)
+
+
+# --- SURVEY WAVES (COMPARISON MODE) ---
+# Later survey waves are dropped into waves/ as CSVs sharing the original schema.
+# Each wave is reduced once to the aggregates the story sections need and cached by
+# content hash; deltas are derived from those aggregates, never from raw rows, so
+# switching the compared pair only costs a few small subtractions.
+
+BASE_WAVE_LABEL = "2014-2015"
+WAVES_DIR = Path("waves")
+WAVE_COLUMNS = ['Occupation', 'Growing_Stress', 'Country', 'Mental_Health_History', 'Days_Indoors', 'Mood_Swings']
+
+def discover_waves():
+    """Maps a display label to every available wave file, base dataset first, then waves/ by name."""
+    waves = {}
+    if DATA_PATH.exists():
+        waves[BASE_WAVE_LABEL] = DATA_PATH
+    if WAVES_DIR.is_dir():
+        for path in sorted(WAVES_DIR.glob("*.csv")):
+            # Suffix a name clash (e.g. waves/2014-2015.csv) so the base dataset stays selectable
+            label = path.stem if path.stem not in waves else f"{path.stem} (waves/)"
+            waves[label] = path
+    return waves
+
+@st.cache_data(show_spinner=False)
+def file_digest(path, mtime_ns, size):
+    """SHA-256 of a wave file. mtime/size are part of the cache key, so unchanged files are only hashed once."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def wave_digest(path):
+    stat = path.stat()
+    return file_digest(str(path), stat.st_mtime_ns, stat.st_size)
+
+@st.cache_data(show_spinner="Aggregating survey wave...")
+def wave_aggregates(digest, _path):
+    """
+    Per-wave aggregates for the comparison view.
+    Cached on the content hash alone (the leading underscore keeps the path out of
+    Streamlit's cache key), so renamed or duplicated files share one entry.
+    """
+    df = pd.read_csv(_path, usecols=WAVE_COLUMNS)
+    return {
+        'n': len(df),
+        'stress': stress_share_by_occupation(df),
+        'history': history_rate_by_country(df),
+        'habit': mood_by_indoors(df),
+    }
+
+def load_wave(path):
+    return wave_aggregates(wave_digest(path), path)
+
+def plot_wave_shift(before, after, label_before, label_after):
+    """
+    Comparison Visualization: Wave Shift.
+    Dumbbell Chart: one row per category present in both waves, sorted by the
+    percentage-point change, which is annotated at the end of each row.
+    Returns None when the waves share no categories.
+    """
+    # Data Prep
+    # NaN only marks a category absent from one wave (0% shares are real values)
+    shift = pd.DataFrame({'before': before, 'after': after}).dropna()
+    if shift.empty:
+        return None
+    
+    setup_chart_style()
+    
+    shift['delta'] = shift['after'] - shift['before']
+    shift = shift.sort_values('delta')
+    low = shift[['before', 'after']].min(axis=1)
+    high = shift[['before', 'after']].max(axis=1)
+    rows = range(len(shift))
+    
+    fig, ax = plt.subplots(figsize=(10, max(4, 0.45 * len(shift))))
+    fig.patch.set_alpha(0.0)
+    ax.patch.set_alpha(0.0)
+    
+    # Dumbbells: Muted Ash for the baseline wave, Electric Clay for the comparison wave
+    ax.hlines(y=rows, xmin=low, xmax=high, color='#8D99AE', alpha=0.4, linewidth=2)
+    ax.scatter(shift['before'], rows, color='#8D99AE', s=80, zorder=3, label=label_before)
+    ax.scatter(shift['after'], rows, color='#E07A5F', s=80, zorder=3, label=label_after)
+    
+    # Styling
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+        
+    ax.set_xticks([])
+    ax.set_yticks(list(rows))
+    ax.set_yticklabels(shift.index)
+    ax.tick_params(axis='y', length=0, labelsize=11, pad=15)
+    
+    # Annotate deltas - Acid Sage for a fall, Electric Clay for a rise
+    x_text = high.max() + 3
+    for i, d in enumerate(shift['delta']):
+        ax.text(x_text, i, f'{d:+.1f} pp', va='center', fontsize=9, fontfamily='monospace',
+                color='#81B29A' if d < 0 else '#E07A5F')
+    
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, 1.1), frameon=False, ncol=2, fontsize=10)
+    
+    return fig
+
+def show_figure(fig):
+    """Renders a figure and closes it, so repeated fragment reruns don't pile up open pyplot figures."""
+    st.pyplot(fig)
+    plt.close(fig)
+
+@st.fragment
+def render_wave_comparison(waves):
+    """Wave pickers plus the three delta views. Runs as a fragment so changing the pair skips the rest of the page."""
+    labels = list(waves)
+    pick_before, pick_after = st.columns(2)
+    label_before = pick_before.selectbox("BASELINE WAVE", labels, index=0)
+    label_after = pick_after.selectbox("COMPARISON WAVE", labels, index=len(labels) - 1)
+    
+    if label_before == label_after:
+        st.info("Pick two different waves to compare.")
+        return
+    
+    try:
+        before = load_wave(waves[label_before])
+        after = load_wave(waves[label_after])
+    except ValueError as e:
+        st.error(f"Could not read survey wave: {e}")
+        return
+    
+    st.markdown(f"""
+        <div style='border-top: 1px solid #2D2D30; border-bottom: 1px solid #2D2D30; padding: 1rem 0; margin: 1rem 0 2rem 0; display: flex; justify-content: space-between;'>
+            <span style='font-family: Space Mono; color: #8D99AE;'>{label_before} • N={before['n']:,}</span>
+            <span style='font-family: Space Mono; color: #E07A5F;'>{label_after} • N={after['n']:,}</span>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    col_work, col_geo = st.columns([1, 1])
+    
+    with col_work:
+        st.markdown("<h4 style='text-align: center; font-family: Space Mono; color: #8D99AE;'>SHIFT IN OCCUPATIONAL STRESS</h4>", unsafe_allow_html=True)
+        fig = plot_wave_shift(before['stress'], after['stress'], label_before, label_after)
+        if fig is None:
+            st.caption("No occupations in common between these waves.")
+        else:
+            show_figure(fig)
+    
+    with col_geo:
+        st.markdown("<h4 style='text-align: center; font-family: Space Mono; color: #8D99AE;'>SHIFT IN HISTORY BY COUNTRY</h4>", unsafe_allow_html=True)
+        fig = plot_wave_shift(before['history'], after['history'], label_before, label_after)
+        if fig is None:
+            st.caption("No countries with significant data in both waves.")
+        else:
+            show_figure(fig)
+    
+    st.markdown("<h4 style='text-align: center; font-family: Space Mono; color: #8D99AE; margin-top: 2rem;'>THE HABIT LOOP, THEN AND NOW</h4>", unsafe_allow_html=True)
+    col_heat_before, col_heat_after, col_heat_delta = st.columns(3)
+    
+    with col_heat_before:
+        st.markdown(f"<p style='text-align: center; font-family: Space Mono; color: #8D99AE;'>{label_before}</p>", unsafe_allow_html=True)
+        show_figure(plot_habit_matrix(before['habit'], figsize=(6, 5)))
+    
+    with col_heat_after:
+        st.markdown(f"<p style='text-align: center; font-family: Space Mono; color: #E07A5F;'>{label_after}</p>", unsafe_allow_html=True)
+        show_figure(plot_habit_matrix(after['habit'], figsize=(6, 5)))
+    
+    with col_heat_delta:
+        st.markdown("<p style='text-align: center; font-family: Space Mono; color: #81B29A;'>Δ PERCENTAGE POINTS</p>", unsafe_allow_html=True)
+        show_figure(plot_habit_matrix(after['habit'] - before['habit'], delta=True, figsize=(6, 5)))
+
+waves = discover_waves()
+
+if len(waves) > 1:
+    st.markdown("<div style='height: 80px;'></div>", unsafe_allow_html=True)
+    
+    # Section 7: Comparison Mode
+    st.markdown("## 07. Across the Waves")
+    st.markdown("<p style='max-width: 600px; margin-bottom: 2rem; color: #8D99AE;'>How the story has moved between survey waves: occupational stress, national history rates, and the isolation-mood matrix.</p>", unsafe_allow_html=True)
+    
+    render_wave_comparison(waves)
+    
+    st.markdown("<div style='height: 100px;'></div>", unsafe_allow_html=True)